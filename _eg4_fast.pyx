@@ -0,0 +1,27 @@
+# cython: language_level=3
+"""Compiled Modbus CRC for eg4_cv_emulator.
+
+Optional: build in place with `python3 setup.py build_ext --inplace`.
+eg4_cv_emulator.py falls back to numba or pure Python when this
+module is not importable.
+"""
+
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef unsigned short crc16_modbus(const unsigned char[:] data):
+    # Modbus RTU CRC16: poly 0xA001, init 0xFFFF; transmitted LSB first.
+    cdef unsigned short crc = 0xFFFF
+    cdef unsigned char b
+    cdef Py_ssize_t i
+    cdef int k
+    for i in range(data.shape[0]):
+        b = data[i]
+        crc ^= b
+        for k in range(8):
+            # -(crc & 1) is all ones iff the low bit is set: xor in the poly without a branch
+            crc = (crc >> 1) ^ (-(crc & 1) & 0xA001)
+    return crc
+
@@ -21,13 +21,26 @@ Then in another shell:
     echo 53 > soc.txt
 
 Notes
+- Optional speedups for the CRC, in order of preference:
+    python3 setup.py build_ext --inplace   # Cython extension (_eg4_fast)
+    pip install numba                      # JIT-compiled CRC
+  Without either, a table-driven pure-Python CRC is used.
+- Optional: `pip install inotify_simple` lets the SOC file watcher sleep until
+  soc.txt is written instead of checking it every 100 ms.
 - If you see lots of BADCRC messages, try --parity E (8E1).
 - This script assumes the RS-485 adapter uses RTS for DE/RE direction control.
 """
 
 import argparse
 import datetime as dt
+import os
+import queue
+import select
+import struct
+import sys
+import threading
 import time
+from array import array
 from typing import Optional, List
 
 import serial
@@ -38,60 +51,324 @@ def ts() -> str:
     return dt.datetime.now().isoformat(timespec="milliseconds")
 
 
-def crc16_modbus(data: bytes) -> int:
+class LazyTS:
+    """Timestamp captured now but only ISO-formatted if something writes it."""
+    __slots__ = ("t", "_s")
+
+    def __init__(self):
+        self.t = time.time()
+        self._s: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._s is None:
+            self._s = dt.datetime.fromtimestamp(self.t).isoformat(timespec="milliseconds")
+        return self._s
+
+
+def _crc16_table_entry(byte: int) -> int:
+    # One byte of the bit-serial Modbus CRC16 (poly 0xA001), starting from crc=byte.
+    crc = byte
+    for _ in range(8):
+        crc = (crc >> 1) ^ (-(crc & 1) & 0xA001)
+    return crc
+
+
+# Slice-by-8 tables: _CRC16_T<k>[b] is the CRC of byte b followed by k zero bytes.
+# _CRC16_T0 is the plain byte-at-a-time table.
+_CRC16_T0 = tuple(_crc16_table_entry(b) for b in range(256))
+
+
+def _crc16_shift_table(prev: tuple) -> tuple:
+    # Advance every entry of prev by one zero byte.
+    return tuple((t >> 8) ^ _CRC16_T0[t & 0xFF] for t in prev)
+
+
+_CRC16_T1 = _crc16_shift_table(_CRC16_T0)
+_CRC16_T2 = _crc16_shift_table(_CRC16_T1)
+_CRC16_T3 = _crc16_shift_table(_CRC16_T2)
+_CRC16_T4 = _crc16_shift_table(_CRC16_T3)
+_CRC16_T5 = _crc16_shift_table(_CRC16_T4)
+_CRC16_T6 = _crc16_shift_table(_CRC16_T5)
+_CRC16_T7 = _crc16_shift_table(_CRC16_T6)
+
+# 8-byte block as one LE u16 (XORed with the running CRC) plus six single bytes.
+_CRC16_BLOCK = struct.Struct("<H6B")
+
+
+def _crc16_py(data: bytes, _t0=_CRC16_T0, _t1=_CRC16_T1, _t2=_CRC16_T2, _t3=_CRC16_T3,
+              _t4=_CRC16_T4, _t5=_CRC16_T5, _t6=_CRC16_T6, _t7=_CRC16_T7,
+              _blocks=_CRC16_BLOCK.iter_unpack) -> int:
     # Modbus RTU CRC16: poly 0xA001, init 0xFFFF; transmitted LSB first.
+    # Slice-by-8 over whole 8-byte blocks, then one table lookup per tail byte.
+    # Accepts bytes, bytearray or memoryview. The tables are bound as default
+    # arguments so the loop reads them as fast locals rather than module globals.
     crc = 0xFFFF
+    tail = len(data) & ~7
+    if tail:
+        for w, b2, b3, b4, b5, b6, b7 in _blocks(memoryview(data)[:tail]):
+            w ^= crc
+            crc = (_t7[w & 0xFF] ^ _t6[w >> 8] ^ _t5[b2] ^ _t4[b3]
+                   ^ _t3[b4] ^ _t2[b5] ^ _t1[b6] ^ _t0[b7])
+        data = data[tail:]
     for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 1:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
-    return crc & 0xFFFF
+        crc = (crc >> 8) ^ _t0[(crc ^ b) & 0xFF]
+    return crc
+
+
+crc16_modbus = _crc16_py
+
+# Backends, in order of preference: the Cython extension, then numba, then the
+# pure-Python CRC above. numba is only imported when the extension is missing.
+try:
+    # Compiled version from _eg4_fast.pyx, if built (see setup.py).
+    from _eg4_fast import crc16_modbus
+    _have_fast = True
+except ImportError:
+    _have_fast = False
+
+njit = None
+if not _have_fast:
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:  # numba is optional; the table-driven CRC above is used instead
+        pass
+
+if njit is not None:
+    @njit(cache=True)
+    def _crc16_jit(data):
+        # Bit-serial CRC compiled to machine code; data is a uint8 array.
+        crc = 0xFFFF
+        for b in data:
+            crc ^= b
+            for _ in range(8):
+                # Branchless: mask is 0xA001 when the low bit is set, else 0.
+                crc = (crc >> 1) ^ (-(crc & 1) & 0xA001)
+        return crc & 0xFFFF
+
+    def crc16_modbus(data: bytes) -> int:
+        return int(_crc16_jit(np.frombuffer(data, dtype=np.uint8)))
+
+
+# One big-endian register, for writing into packed register data in place.
+_REG = struct.Struct(">H")
+
+# Frame CRC, transmitted LSB first.
+_CRC = struct.Struct("<H")
+
+# Start address and register count of a read request, at offset 2.
+_START_COUNT = struct.Struct(">HH")
+
+# First 6 bytes of a read request: slave id, function, start, count.
+_READ_REQ = struct.Struct(">BBHH")
+
+
+def rtu_frame(adu: bytes) -> bytes:
+    # Append the Modbus CRC (LSB first) to slave id + PDU.
+    return bytes(adu) + _CRC.pack(crc16_modbus(adu))
+
+
+# Registers carrying SOC; patched live into any read that covers them.
+SOC_REGS = (0x0015, 0x0018)
+
+# (start, count) of the Chargeverter poll: regs 0x0013..0x0023.
+CV_POLL = (0x0013, 0x0011)
 
 
-def regs_to_bytes(regs: List[int]) -> bytes:
-    out = bytearray()
-    for r in regs:
-        out.append((r >> 8) & 0xFF)
-        out.append(r & 0xFF)
-    return bytes(out)
+class ReadTemplate:
+    """Pre-built function 0x03 response for one (start, count).
+
+    Only the SOC registers and the CRC ever change, so they are patched in
+    place and the CRC is recomputed only when SOC moves.
+    """
+    def __init__(self, sid: int, start: int, payload: bytes):
+        self.frame = bytearray([sid, 0x03, len(payload)]) + payload + b"\x00\x00"
+        self.start = start
+        self.count = count = len(payload) // 2
+        self.soc_offsets = [3 + 2 * (r - start) for r in SOC_REGS if start <= r < start + count]
+        self.soc: Optional[int] = None
+
+    def render(self, soc: int) -> bytearray:
+        if soc != self.soc:
+            frame = self.frame
+            for off in self.soc_offsets:
+                _REG.pack_into(frame, off, soc)
+            _CRC.pack_into(frame, len(frame) - 2, crc16_modbus(memoryview(frame)[:-2]))
+            self.soc = soc
+        return self.frame
+
+
+def read_response(sid: int, base: memoryview, start: int, count: int, soc: int) -> bytearray:
+    """Function 0x03 response for `count` registers of the packed map at `start`.
+
+    Built in one pre-sized buffer: header, register slice, SOC patches, CRC.
+    """
+    n = 2 * count
+    frame = bytearray(3 + n + 2)
+    frame[0] = sid
+    frame[1] = 0x03
+    frame[2] = n
+    frame[3:3 + n] = base[2 * start:2 * (start + count)]
+    # Patch SOC live into known candidate registers if included in this read
+    for r in SOC_REGS:
+        if start <= r < start + count:
+            _REG.pack_into(frame, 3 + 2 * (r - start), soc)
+    _CRC.pack_into(frame, 3 + n, crc16_modbus(memoryview(frame)[:3 + n]))
+    return frame
 
 
 class GapFramer:
     """Frame bytes by idle gap; sufficient for Modbus RTU in practice."""
-    def __init__(self, gap_s: float):
-        self.gap_s = gap_s
+    def __init__(self, gap_ns: int):
+        self.gap_ns = gap_ns
         self.buf = bytearray()
-        self.last_rx: Optional[float] = None
+        self.last_rx_ns: Optional[int] = None
 
-    def feed(self, chunk: bytes, now: float) -> Optional[bytes]:
+    def feed(self, chunk: bytes, now_ns: int) -> Optional[bytearray]:
+        # now_ns is time.monotonic_ns(): integer math, immune to wall-clock jumps.
         if chunk:
             self.buf.extend(chunk)
-            self.last_rx = now
+            self.last_rx_ns = now_ns
             return None
-        if self.buf and self.last_rx is not None and (now - self.last_rx) >= self.gap_s:
-            out = bytes(self.buf)
-            self.buf.clear()
+        if self.buf and self.last_rx_ns is not None and (now_ns - self.last_rx_ns) >= self.gap_ns:
+            # Hand the buffer itself out rather than copying it.
+            out = self.buf
+            self.buf = bytearray()
             return out
         return None
 
 
-def load_soc(path: str, default: int) -> int:
+# (st_mtime_ns, st_size) of the SOC file when last parsed, and the value parsed.
+_soc_cache = {"stamp": None, "value": 0}
+
+
+def load_soc(path: str, default: int, force: bool = False) -> int:
+    # Only re-read the file when stat() says it changed. Two same-size writes inside
+    # one coarse mtime tick look unchanged, so callers that know a write happened
+    # pass force=True.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return default
+    stamp = (st.st_mtime_ns, st.st_size)
+    if not force and stamp == _soc_cache["stamp"]:
+        return _soc_cache["value"]
     try:
         with open(path, "r") as f:
             raw = f.read().strip()
-        v = int(float(raw))
-        return max(0, min(100, v))
+        v = max(0, min(100, int(float(raw))))
     except Exception:
+        # Not cached, so a half-written file is re-read on the next call.
         return default
-
-
-def log_line(fp, s: str):
-    if fp is not None:
-        fp.write(s + "\n")
-        fp.flush()
+    _soc_cache["stamp"] = stamp
+    _soc_cache["value"] = v
+    return v
+
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # inotify_simple is optional; watch_soc falls back to stat() polling
+    INotify = None
+
+# Seconds between SOC file checks when polling, and the longest wait for an
+# inotify event before checking anyway.
+SOC_POLL_S = 0.1
+SOC_INOTIFY_TIMEOUT_S = 1.0
+
+
+def watch_soc(path: str, default: int, state: List[int]):
+    """Keep state[0] equal to the SOC in `path`; runs on its own daemon thread.
+
+    With inotify_simple, sleeps until the file's directory reports a finished
+    write, rename or delete; otherwise re-checks every SOC_POLL_S seconds.
+    """
+    ino = None
+    if INotify is not None:
+        try:
+            ino = INotify()
+            ino.add_watch(os.path.dirname(os.path.abspath(path)),
+                          inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                          | inotify_flags.MOVED_FROM | inotify_flags.DELETE)
+        except OSError:
+            ino = None
+    force = False
+    while True:
+        # A single reference store, so the main loop never sees a torn value.
+        state[0] = load_soc(path, default, force=force)
+        if ino is not None:
+            # Events mean a write finished: bypass the stat cache on the next read.
+            force = bool(ino.read(timeout=int(SOC_INOTIFY_TIMEOUT_S * 1000)))
+        else:
+            time.sleep(SOC_POLL_S)
+
+
+class LogWriter:
+    """Append log lines to a file from a background thread.
+
+    Records are queued unformatted; the thread formats them and writes in
+    batches, flushing every BATCH lines or FLUSH_S seconds, whichever first.
+    A write error (disk full, file gone) is reported once on stderr; after
+    that records are drained and dropped so the queue cannot grow unbounded.
+    """
+    BATCH = 64
+    FLUSH_S = 0.25
+
+    def __init__(self, path: str):
+        self.fp = open(path, "a")
+        self.q: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.failed = False
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, fmt: str, args: tuple):
+        self.q.put_nowait((fmt, args))
+
+    def close(self):
+        # Sentinel: the thread writes whatever is still queued, then exits.
+        self.q.put_nowait(None)
+        self.thread.join()
+        try:
+            self.fp.close()
+        except OSError as e:
+            self._report(e)
+
+    def _report(self, e: OSError):
+        if not self.failed:
+            self.failed = True
+            print(f"{ts()} log file {self.fp.name}: {e}; logging disabled", file=sys.stderr)
+
+    def _run(self):
+        batch: List[str] = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = None
+            if batch:
+                timeout = max(0.0, self.FLUSH_S - (time.monotonic() - last_flush))
+            try:
+                item = self.q.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item and not self.failed:
+                fmt, args = item
+                batch.append(fmt % args if args else fmt)
+            if batch and (item is None or len(batch) >= self.BATCH
+                          or time.monotonic() - last_flush >= self.FLUSH_S):
+                try:
+                    self.fp.write("\n".join(batch) + "\n")
+                    self.fp.flush()
+                except OSError as e:
+                    self._report(e)
+                batch.clear()
+                last_flush = time.monotonic()
+            if item is None:
+                return
+
+
+def log_line(fp: LogWriter, fmt: str, *args):
+    # Queued as-is and %-formatted on the writer thread (LazyTS included).
+    # Callers check for a log file first, so arguments such as hex dumps are
+    # never built when nothing will be written.
+    fp.put(fmt, args)
 
 
 def main():
@@ -116,7 +393,7 @@ def main():
         parity=parity_map[args.parity],
         stopbits=serial.STOPBITS_ONE if args.stopbits == 1 else serial.STOPBITS_TWO,
         bytesize=serial.EIGHTBITS,
-        timeout=0.0,  # non-blocking
+        timeout=0.0,  # unused: reads go through os.read on the fd (see main loop)
     )
 
     # RS-485 direction control (RTS toggles DE on most HATs/adapters)
@@ -131,21 +408,44 @@ def main():
     # Minimal register map covering 0x0000..0x0026 (39 regs).
     # Chargeverter poll: start=0x0013 count=0x0011 (regs 0x0013..0x0023)
     # We respond to any read fully within this map.
-    base = [0] * 0x27
+    nregs = 0x27
+    regs = array("H", bytes(2 * nregs))
 
     # Seed plausible / consistent values. The key ones are SOC + SOH.
-    base[0x0013] = 0x0017
-    base[0x0014] = 0x0018
-    base[0x0015] = args.default_soc   # SOC (patched live)
-    base[0x0016] = 0x0032             # arbitrary but plausible
-    base[0x0017] = 0x0064             # SOH = 100
-    base[0x0018] = args.default_soc   # SOC duplicate (patched live)
+    regs[0x0013] = 0x0017
+    regs[0x0014] = 0x0018
+    regs[0x0015] = args.default_soc   # SOC (patched live)
+    regs[0x0016] = 0x0032             # arbitrary but plausible
+    regs[0x0017] = 0x0064             # SOH = 100
+    regs[0x0018] = args.default_soc   # SOC duplicate (patched live)
     # Remaining registers default 0 for now.
 
-    framer = GapFramer(args.gap_ms / 1000.0)
+    # Swap once into wire order (big-endian u16); reads then slice this byte view
+    # of the array directly, with no per-register conversion.
+    if sys.byteorder == "little":
+        regs.byteswap()
+    base = memoryview(regs).cast("B")
+
+    slave_id = args.slave & 0xFF
+
+    # Requests we expect, keyed by their first 6 bytes and answered from a response
+    # built once; anything else takes the general path.
+    start, count = CV_POLL
+    fast = {
+        _READ_REQ.pack(slave_id, 0x03, start, count):
+            ReadTemplate(slave_id, start, base[2 * start:2 * (start + count)]),
+    }
+
+    # Exception replies depend only on slave id and function code: build them all now.
+    exc01 = tuple(rtu_frame(bytes([slave_id, func | 0x80, 0x01])) for func in range(256))
+    exc02 = rtu_frame(bytes([slave_id, 0x83, 0x02]))
+
+    framer = GapFramer(int(args.gap_ms * 1_000_000))
 
-    logfp = open(args.log, "a", buffering=1) if args.log else None
-    log_line(logfp, f"{ts()} START port={args.port} baud={args.baud} parity={args.parity} slave=0x{args.slave:02X}")
+    logfp = LogWriter(args.log) if args.log else None
+    if logfp is not None:
+        log_line(logfp, "%s START port=%s baud=%d parity=%s slave=0x%02X",
+                 LazyTS(), args.port, args.baud, args.parity, args.slave)
 
     if not args.quiet:
         print(f"{ts()} emulator up: slave=0x{args.slave:02X} port={args.port} baud={args.baud} parity={args.parity}")
@@ -154,109 +454,126 @@ def main():
     last_soc = None
     poll_ok = 0
     poll_badcrc = 0
-    last_rate_t = time.time()
+    last_rate_ns = time.monotonic_ns()
+
+    # Read the tty fd directly: poll() sleeps until bytes arrive or one RTU gap
+    # passes, then os.read() takes whatever is buffered. pyserial is only used for
+    # port setup, RS-485 mode and writes.
+    fd = ser.fileno()
+    poller = select.poll()
+    poller.register(fd, select.POLLIN)
+
+    # SOC file is watched off the hot path; the loop just reads the latest value.
+    soc_state = [load_soc(args.soc_file, args.default_soc)]
+    threading.Thread(target=watch_soc, args=(args.soc_file, args.default_soc, soc_state),
+                     name="soc-watcher", daemon=True).start()
 
     try:
         while True:
-            now = time.time()
-
-            # Update SOC from file
-            soc = load_soc(args.soc_file, args.default_soc)
+            # Latest SOC from the watcher thread
+            soc = soc_state[0]
             if soc != last_soc:
-                print(f"{ts()} SOC={soc}%")
-                log_line(logfp, f"{ts()} SOC={soc}")
+                stamp = LazyTS()
+                print(f"{stamp} SOC={soc}%")
+                if logfp is not None:
+                    log_line(logfp, "%s SOC=%d", stamp, soc)
                 last_soc = soc
 
-            # Read bytes and frame by idle gap
-            chunk = ser.read(4096)
-            pkt = framer.feed(chunk, now)
-            if pkt is None:
-                time.sleep(0.001)
-            else:
+            # Read bytes and frame by idle gap: poll blocks until bytes arrive or
+            # the gap elapses, so an empty read after data ends the frame.
+            chunk = b""
+            if poller.poll(args.gap_ms):
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise serial.SerialException("device reports readiness to read but returned no data")
+            now_ns = time.monotonic_ns()
+            pkt = framer.feed(chunk, now_ns)
+            if pkt is not None:
+                stamp = LazyTS()
                 if len(pkt) < 8:
                     if not args.quiet:
-                        print(f"{ts()} RX short len={len(pkt)} hex={pkt.hex(' ')}")
-                    log_line(logfp, f"{ts()} RX short len={len(pkt)} hex={pkt.hex(' ')}")
+                        print(f"{stamp} RX short len={len(pkt)} hex={pkt.hex(' ')}")
+                    if logfp is not None:
+                        log_line(logfp, "%s RX short len=%d hex=%s", stamp, len(pkt), pkt.hex(" "))
+                    continue
+
+                # Traffic for other slaves on the bus: drop it before paying for a CRC
+                if pkt[0] != slave_id:
                     continue
 
                 # CRC validate
-                body = pkt[:-2]
-                want = pkt[-2] | (pkt[-1] << 8)
-                got = crc16_modbus(body)
+                mv = memoryview(pkt)
+                want, = _CRC.unpack_from(mv, len(mv) - 2)
+                got = crc16_modbus(mv[:-2])
                 if got != want:
                     poll_badcrc += 1
                     if not args.quiet:
-                        print(f"{ts()} BADCRC len={len(pkt)} hex={pkt.hex(' ')}")
-                    log_line(logfp, f"{ts()} BADCRC len={len(pkt)} hex={pkt.hex(' ')} got=0x{got:04X} want=0x{want:04X}")
+                        print(f"{stamp} BADCRC len={len(pkt)} hex={pkt.hex(' ')}")
+                    if logfp is not None:
+                        log_line(logfp, "%s BADCRC len=%d hex=%s got=0x%04X want=0x%04X",
+                                 stamp, len(pkt), pkt.hex(" "), got, want)
                     continue
 
                 poll_ok += 1
-                sid, func = pkt[0], pkt[1]
-                if sid != (args.slave & 0xFF):
-                    continue
+                sid, func = mv[0], mv[1]
 
                 if not args.quiet:
-                    print(f"{ts()} RX {pkt.hex(' ')}")
-                log_line(logfp, f"{ts()} RX {pkt.hex(' ')}")
-
-                if func != 0x03:
+                    print(f"{stamp} RX {pkt.hex(' ')}")
+                if logfp is not None:
+                    log_line(logfp, "%s RX %s", stamp, pkt.hex(" "))
+
+                tmpl = fast.get(bytes(mv[:6]))
+                if tmpl is not None:
+                    # Known request (the Chargeverter poll): no parsing or bounds checks
+                    start, count = tmpl.start, tmpl.count
+                    resp2 = tmpl.render(soc)
+                elif func != 0x03:
                     # Illegal function
-                    resp = bytes([sid, func | 0x80, 0x01])
-                    c = crc16_modbus(resp)
-                    resp2 = resp + bytes([c & 0xFF, (c >> 8) & 0xFF])
+                    resp2 = exc01[func]
                     ser.write(resp2)
                     if not args.quiet:
-                        print(f"{ts()} TX EXC01 {resp2.hex(' ')}")
-                    log_line(logfp, f"{ts()} TX EXC01 {resp2.hex(' ')}")
+                        print(f"{stamp} TX EXC01 {resp2.hex(' ')}")
+                    if logfp is not None:
+                        log_line(logfp, "%s TX EXC01 %s", stamp, resp2.hex(" "))
                     continue
-
-                start = (pkt[2] << 8) | pkt[3]
-                count = (pkt[4] << 8) | pkt[5]
-
-                if start + count > len(base):
-                    # Illegal data address
-                    resp = bytes([sid, 0x83, 0x02])
-                    c = crc16_modbus(resp)
-                    resp2 = resp + bytes([c & 0xFF, (c >> 8) & 0xFF])
-                    ser.write(resp2)
-                    if not args.quiet:
-                        print(f"{ts()} TX EXC02 start=0x{start:04X} count={count}")
-                    log_line(logfp, f"{ts()} TX EXC02 start=0x{start:04X} count={count} hex={resp2.hex(' ')}")
-                    continue
-
-                regs = base[start:start + count].copy()
-
-                # Patch SOC live into known candidate registers if included in this read
-                if start <= 0x0015 < start + count:
-                    regs[0x0015 - start] = soc
-                if start <= 0x0018 < start + count:
-                    regs[0x0018 - start] = soc
-
-                payload = regs_to_bytes(regs)
-                resp = bytes([sid, 0x03, len(payload)]) + payload
-                c = crc16_modbus(resp)
-                resp2 = resp + bytes([c & 0xFF, (c >> 8) & 0xFF])
+                else:
+                    start, count = _START_COUNT.unpack_from(mv, 2)
+
+                    if start + count > nregs:
+                        # Illegal data address
+                        resp2 = exc02
+                        ser.write(resp2)
+                        if not args.quiet:
+                            print(f"{stamp} TX EXC02 start=0x{start:04X} count={count}")
+                        if logfp is not None:
+                            log_line(logfp, "%s TX EXC02 start=0x%04X count=%d hex=%s",
+                                     stamp, start, count, resp2.hex(" "))
+                        continue
+
+                    resp2 = read_response(sid, base, start, count, soc)
                 ser.write(resp2)
 
                 if not args.quiet:
-                    print(f"{ts()} TX start=0x{start:04X} count={count} soc={soc} bytes={len(resp2)}")
-                log_line(logfp, f"{ts()} TX start=0x{start:04X} count={count} soc={soc} bytes={len(resp2)} hex={resp2.hex(' ')}")
+                    print(f"{stamp} TX start=0x{start:04X} count={count} soc={soc} bytes={len(resp2)}")
+                if logfp is not None:
+                    log_line(logfp, "%s TX start=0x%04X count=%d soc=%d bytes=%d hex=%s",
+                             stamp, start, count, soc, len(resp2), resp2.hex(" "))
 
             # periodic rate report
-            if not args.quiet and (time.time() - last_rate_t) > 5.0:
-                dt_s = time.time() - last_rate_t
+            if not args.quiet and (now_ns - last_rate_ns) > 5_000_000_000:
+                dt_s = (now_ns - last_rate_ns) / 1e9
                 rate_ok = poll_ok / dt_s
                 rate_bad = poll_badcrc / dt_s
-                print(f"{ts()} rate ok={rate_ok:.1f}/s badcrc={rate_bad:.1f}/s")
+                print(f"{LazyTS()} rate ok={rate_ok:.1f}/s badcrc={rate_bad:.1f}/s")
                 poll_ok = 0
                 poll_badcrc = 0
-                last_rate_t = time.time()
+                last_rate_ns = now_ns
 
     except KeyboardInterrupt:
         pass
     finally:
-        log_line(logfp, f"{ts()} STOP")
-        if logfp:
+        if logfp is not None:
+            log_line(logfp, "%s STOP", LazyTS())
             logfp.close()
         ser.close()
 
@@ -0,0 +1,20 @@
+"""Build the optional compiled helpers:
+
+    python3 setup.py build_ext --inplace
+"""
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name="eg4mimic-fast",
+    ext_modules=cythonize(
+        [
+            Extension(
+                "_eg4_fast",
+                ["_eg4_fast.pyx"],
+                extra_compile_args=["-O3", "-march=native"],
+            )
+        ],
+    ),
+)